@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 from modberg import *
 
@@ -22,21 +24,37 @@ year_start, year_end = st.slider(
     'Select range for mean annual temperature summary',
     2007, 2100, (2040, 2069))
 
-mat = get_projected_mat_from_api(
-    lat, lon, model, scenario, year_start, year_end)
-mat_str = f"Mean Annual Temperature: {mat}°F"
-st.subheader(mat_str)
+mat_placeholder = st.empty()
 
 st.subheader(
     "Retrieve the RCP 8.5 design freezing index (°F days) from the SNAP Data API")
-model = st.radio(
+fi_model = st.radio(
     "climate model for the design freezing index (only two are available)",
     ("GFDL-CM3", "NCAR-CCSM4"))
 era = st.radio(
     "summary era for the design freezing index",
     ("2040-2069", "2070-2099"))
 
-FI = get_projected_design_fi_from_api(lat, lon, model, era)
+# Only query the API when the location or climate selections change, so
+# moving a climate or soil parameter slider reuses the previous values.
+api_inputs = (lat, lon, model, scenario, year_start, year_end, fi_model, era)
+if st.session_state.get("api_inputs") != api_inputs:
+    # Both queries hit the same host, so issue them concurrently.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        mat_future = executor.submit(
+            get_projected_mat_from_api,
+            lat, lon, model, scenario, year_start, year_end)
+        fi_future = executor.submit(
+            get_projected_design_fi_from_api, lat, lon, fi_model, era)
+        st.session_state["mat"] = mat_future.result()
+        st.session_state["FI"] = fi_future.result()
+    st.session_state["api_inputs"] = api_inputs
+mat = st.session_state["mat"]
+FI = st.session_state["FI"]
+
+mat_str = f"Mean Annual Temperature: {mat}°F"
+mat_placeholder.subheader(mat_str)
+
 fi_str = f"Design Freezing Index: {FI} °F days"
 st.subheader(fi_str)
 
@@ -70,7 +88,6 @@ mb = compute_modified_bergrenn(
     d,
     nFI,
     k_avg,
-    lat, lon, model, scenario, year_start, year_end
 )
 
 st.success(f"COMPUTED FROST DEPTH (FT.): {mb}")
@@ -1,11 +1,26 @@
-import numpy as np
+import math
+
 import requests
-import pandas as pd
+import streamlit as st
+from requests.adapters import HTTPAdapter, Retry
 
 """
 A module to compute Modified Berggren Frost Depth.
 """
 
+# Reuse a single connection pool for all SNAP Data API requests, and retry
+# transient gateway errors with backoff.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        max_retries=Retry(
+            total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+    ),
+)
+# (connect, read) timeouts in seconds for SNAP Data API requests.
+_TIMEOUT = (3, 10)
+
 
 def compute_volumetric_latent_heat_of_fusion(dry_ro, wc_pct):
     """Compute the amount of heat required to melt all the ice or freeze the pore water) in a unit volume of soil.
@@ -70,24 +85,44 @@ def compute_seasonal_v_s(nFI, d):
     return v_s
 
 
-def get_projected_mat_from_api(lat, lon, model, scenario, year_start, year_end):
-    """Query the SNAP Data API for mean annual temperature."""
+@st.cache_data(show_spinner=False, ttl=3600)
+def fetch_temperature_from_api(lat, lon):
+    """Query the SNAP Data API for all projected temperature data at a point.
 
+    Results are cached so that reruns of the app with the same location do not hit the API again.
+    """
     api_url = f"https://earthmaps.io/mmm/temperature/all/{lat}/{lon}"
-    resp = requests.get(api_url).json()[model][scenario]
-    df = pd.json_normalize(resp, sep="_").T
-    years = [int(j.split('_')[0]) for j in df.index.values]
-    df["year"] = years
-    df.set_index("year", inplace=True)
-    mean_temp_degC = df.loc[year_start:year_end].mean()
+    return _SESSION.get(api_url, timeout=_TIMEOUT).json()
+
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def fetch_design_fi_from_api(lat, lon):
+    """Query the SNAP Data API for all design freezing index data at a point.
+
+    Results are cached so that reruns of the app with the same location do not hit the API again.
+    """
+    api_url = f"https://earthmaps.io/design_index/freezing/all/point/{lat}/{lon}"
+    return _SESSION.get(api_url, timeout=_TIMEOUT).json()
+
+
+def get_projected_mat_from_api(lat, lon, model, scenario, year_start, year_end):
+    """Query the SNAP Data API for mean annual temperature."""
+    resp = fetch_temperature_from_api(lat, lon)[model][scenario]
+    temps = []
+    for key, value in resp.items():
+        if year_start <= int(key.split("_")[0]) <= year_end:
+            if isinstance(value, dict):
+                temps.extend(value.values())
+            else:
+                temps.append(value)
+    mean_temp_degC = sum(temps) / len(temps)
     mat_degF = (mean_temp_degC * 1.8) + 32
-    return float(round(mat_degF, 1))
+    return round(mat_degF, 1)
 
 
 def get_projected_design_fi_from_api(lat, lon, model, era):
     """Query the SNAP Data API for design freezing index."""
-    api_url = f"https://earthmaps.io/design_index/freezing/all/point/{lat}/{lon}"
-    design_freezing_index_degF = requests.get(api_url).json()[model][era]["di"]
+    design_freezing_index_degF = fetch_design_fi_from_api(lat, lon)[model][era]["di"]
     return design_freezing_index_degF
 
 
@@ -154,7 +189,7 @@ def compute_coeff(mu, thermal_ratio):
     Citation: H. P. Aldrich and H. M. Paynter, “Analytical Studies of Freezing and Thawing of Soils,” Arctic Construction and Frost Effects Laboratory, Corps of Engineers, U.S. Army, Boston, MA, First Interim Technical Report 42, Jun. 1953.
 
     Other implementations:
-    lc2 = 0.707 / (np.sqrt(1 + (mu * (thermal_ratio + 0.5))))
+    lc2 = 0.707 / (math.sqrt(1 + (mu * (thermal_ratio + 0.5))))
     lc_mean = round(np.mean([lc1, lc2]), 2)
 
     These are included because:
@@ -168,7 +203,7 @@ def compute_coeff(mu, thermal_ratio):
     Returns
         lc: the lambda coeffcient value (dimensionless).
     """
-    lc = 1.0 / (np.sqrt(1 + (mu * (thermal_ratio + 0.5))))
+    lc = 1.0 / (math.sqrt(1 + (mu * (thermal_ratio + 0.5))))
     return round(lc, 2)
 
 
@@ -183,11 +218,11 @@ def compute_depth_of_freezing(coeff, k_avg, nFI, L):
     Returns:
         x: frost depth (feet)
     """
-    x = coeff * np.sqrt((48 * k_avg * nFI) / L)
+    x = coeff * math.sqrt((48 * k_avg * nFI) / L)
     return round(x, 1)
 
 
-def compute_modified_bergrenn(dry_ro, wc_pct, mat, magt, d, nFI, k_avg, lat, lon, model, scenario, year_start, year_end):
+def compute_modified_bergrenn(dry_ro, wc_pct, mat, magt, d, nFI, k_avg):
     """
     Args:
     dry_ro: soil dry density (lbs per cubic foot)
@@ -198,14 +233,14 @@ def compute_modified_bergrenn(dry_ro, wc_pct, mat, magt, d, nFI, k_avg, lat, lon
     nFI: surface freezing index (°F • days)
     k_avg: thermal conductivity of soil, average of frozen and unfrozen (BTU/hr • ft • °F)
     """
-    mat = get_projected_mat_from_api(
-        lat, lon, model, scenario, year_start, year_end)
-    L = compute_volumetric_latent_heat_of_fusion(dry_ro, wc_pct)
-    c = compute_avg_volumetric_specific_heat(dry_ro, wc_pct)
-    v_s = compute_seasonal_v_s(nFI, d)
-    v_o = compute_v_o(magt)
-    thermal_ratio = compute_thermal_ratio(v_o, v_s)
-    mu = compute_fusion_parameter(v_s, c, L)
-    lambda_coeff = compute_coeff(mu, thermal_ratio)
-    frost_depth = compute_depth_of_freezing(lambda_coeff, k_avg, nFI, L)
-    return frost_depth
+    # The helper functions above are inlined here rather than chained, which
+    # avoids rounding the intermediate values. Only the frost depth is rounded.
+    L = 144 * dry_ro * (wc_pct / 100)
+    c = dry_ro * (0.17 + (0.75 * (wc_pct / 100)))
+    v_s = nFI / d
+    v_o = abs(magt - 32)
+    thermal_ratio = v_o / v_s
+    mu = v_s * (c / L)
+    lambda_coeff = 1.0 / math.sqrt(1 + (mu * (thermal_ratio + 0.5)))
+    frost_depth = lambda_coeff * math.sqrt((48 * k_avg * nFI) / L)
+    return round(frost_depth, 1)